@@ -14,17 +14,80 @@
 #       structure.
 
 import argparse
+import copy
+import functools
+import io
+import mmap
+import re
 import yaml
 import sys
 import os
 import tempfile
 
+# Prefer the libyaml C loader; fall back to the pure-Python one when PyYAML
+# was built without libyaml.
+try:
+  from yaml import CSafeLoader as SafeLoader
+except ImportError:
+  from yaml import SafeLoader
+
+try:
+  from yaml import CSafeDumper as SafeDumper
+except ImportError:
+  from yaml import SafeDumper
+
+# Bind the yaml entry points once so the hot paths don't repeat the module
+# attribute lookup on every parameter.
+_yaml_load = yaml.load
+_yaml_dump = yaml.dump
+
+# Scalars the dumper would emit verbatim, so a plain f-string gives the
+# identical cell. Anything the emitter would quote or restyle — YAML
+# keywords, booleans, floats, strings with spaces or punctuation — still
+# goes through yaml.dump.
+_PLAIN_SCALAR_RE = re.compile(r'[A-Za-z][A-Za-z0-9_.-]*$')
+_YAML_KEYWORDS = frozenset(('true', 'false', 'yes', 'no', 'on', 'off',
+                            'null'))
+
+
+def _is_plain_scalar(value):
+  if value is True or value is False:
+    return False
+
+  if isinstance(value, int):
+    return True
+
+  # fullmatch, not match: $ would match before a trailing newline and let a
+  # block-scalar string with one slip through and split the table row.
+  return (isinstance(value, str) and bool(_PLAIN_SCALAR_RE.fullmatch(value))
+          and value.lower() not in _YAML_KEYWORDS)
+
 
 ##############################################################################
 class ADOPipelineDocException(Exception):
   pass
 
 
+##############################################################################
+@functools.lru_cache(maxsize=128)
+def _load_pipeline(path, mtime):
+  """
+  Parses the YAML file at path and caches the result keyed on (path, mtime)
+  so repeated runs against an unchanged pipeline skip the re-parse.
+
+  Args:
+    path (str): The path to the YAML file.
+    mtime (int): The file's st_mtime_ns, used to invalidate the cache entry.
+
+  Returns:
+    any: The parsed YAML data.
+  """
+  # Hand the loader the open binary stream; libyaml reads and decodes it
+  # chunk by chunk without materializing the file as a Python string first.
+  with open(path, 'rb') as file:
+    return _yaml_load(file, Loader=SafeLoader)
+
+
 ##############################################################################
 class ADOPipelineDoc:
   #---------------------------------------------------------------------------
@@ -48,6 +111,19 @@ class ADOPipelineDoc:
     self.mdStart = 'ADOPipelineDoc Start'
     self.yamlFile = yamlFile
 
+    # The markers are constant, so build them (and their byte forms for the
+    # writeFile scan) once instead of per call.
+    self._startMarker = f"<!-- {self.mdStart} -->"
+    self._endMarker = f"<!-- {self.mdEnd} -->"
+    self._startMarkerBytes = self._startMarker.encode()
+    self._endMarkerBytes = self._endMarker.encode()
+
+    # One alternation finds both markers in a single scan of the markdown;
+    # group 1 distinguishes a start marker from an end marker.
+    self._markerRE = re.compile(
+      b"(" + re.escape(self._startMarkerBytes) + b")|" +
+      re.escape(self._endMarkerBytes))
+
     if self.yamlFile is None:
       raise ADOPipelineDocException(
         "Input file must be provided to ADOPipelineDoc.")
@@ -56,6 +132,25 @@ class ADOPipelineDoc:
     self.processData()
     self.writeFile()
 
+  #---------------------------------------------------------------------------
+  @classmethod
+  def runMany(cls, jobs):
+    """
+    Processes a batch of (yamlFile, mdFile) pairs in a single process.
+
+    Bulk documentation runs that would otherwise invoke the script once per
+    repository can call this instead: one interpreter handles every job, and
+    jobs sharing a pipeline YAML hit the parse cache rather than re-reading
+    the file.
+
+    Args:
+      jobs (iterable): (yamlFile, mdFile) pairs as accepted by __init__.
+
+    Returns:
+      list: The ADOPipelineDoc instance created for each job, in order.
+    """
+    return [cls(yamlFile, mdFile) for yamlFile, mdFile in jobs]
+
   #---------------------------------------------------------------------------
   def mdStartStr(self):
     """
@@ -65,7 +160,7 @@ class ADOPipelineDoc:
     Returns:
       str: The markdown start string.
     """
-    return f"<!-- {self.mdStart} -->"
+    return self._startMarker
 
   def mdEndStr(self):
     """
@@ -75,7 +170,7 @@ class ADOPipelineDoc:
     Returns:
       str: The markdown end string.
     """
-    return f"<!-- {self.mdEnd} -->"
+    return self._endMarker
 
   def printTable(self):
     """
@@ -85,32 +180,7 @@ class ADOPipelineDoc:
     parameter details such as name, type, and any optional fields, to the
     console. It is used when no markdown file is specified for output.
     """
-    print("\n".join(self.table_rows))
-
-  #---------------------------------------------------------------------------
-  def readFile(self, file_path):
-    """
-    Reads the content of a file.
-
-    Args:
-      file_path (str): The path to the file to be read.
-
-    Returns:
-      str: The content of the file.
-
-    Raises:
-      ADOPipelineDocException: If the file cannot be accessed.
-    """
-    try:
-      with open(file_path, 'r') as file:
-        return file.read()
-
-    except FileNotFoundError:
-      raise ADOPipelineDocException(f"The file {file_path} was not found.")
-
-    except PermissionError:
-      raise ADOPipelineDocException(
-        f"Permission denied for file {file_path}.")
+    sys.stdout.write(self.table_text)
 
   #---------------------------------------------------------------------------
   def prettyObject(self, obj, key=None):
@@ -138,12 +208,21 @@ class ADOPipelineDoc:
       if key not in obj:
         raise ADOPipelineDocException(f"Key '{key}' not found in the object.")
 
-      pretty = yaml.dump(obj[key], default_flow_style=False)
+      pretty = _yaml_dump(obj[key], Dumper=SafeDumper, default_flow_style=False)
 
     else:
-      pretty = yaml.dump(obj, default_flow_style=False)
+      pretty = _yaml_dump(obj, Dumper=SafeDumper, default_flow_style=False)
+
+    # split/join beats replace here: split takes the ASCII fast path and
+    # join allocates the result once at its final size.
+    lines = pretty.strip().split('\n')
 
-    return pretty.strip().replace('\n', '<br/>')
+    # The pure-Python emitter ends scalar documents with a '...' marker that
+    # libyaml omits; drop it so both builds render the same cell.
+    if lines[-1] == '...':
+      lines.pop()
+
+    return '<br/>'.join(lines)
 
   #---------------------------------------------------------------------------
   def parseYAML(self):
@@ -158,8 +237,10 @@ class ADOPipelineDoc:
         - If there is an error in parsing the YAML content.
     """
     try:
-      content = self.readFile(self.yamlFile)
-      self.data = yaml.safe_load(content)
+      mtime = os.stat(self.yamlFile).st_mtime_ns
+
+      # Deep-copy so later mutation of self.data can't poison the cache.
+      self.data = copy.deepcopy(_load_pipeline(self.yamlFile, mtime))
 
       if self.data is None:
         raise ADOPipelineDocException(
@@ -172,6 +253,14 @@ class ADOPipelineDoc:
 
       self.parameters = params
 
+    except FileNotFoundError:
+      raise ADOPipelineDocException(
+        f"The file {self.yamlFile} was not found.")
+
+    except PermissionError:
+      raise ADOPipelineDocException(
+        f"Permission denied for file {self.yamlFile}.")
+
     except yaml.YAMLError as e:
       raise ADOPipelineDocException(f"Error parsing YAML file: {e}")
 
@@ -182,9 +271,9 @@ class ADOPipelineDoc:
     format.
 
     This method checks each parameter for required fields and optional fields
-    like displayName, values, and default. It creates each row in the table and
-    stores them in the table_rows attribute as an array. The table includes
-    headers and rows representing each parameter's details.
+    like displayName, values, and default. It formats the complete table —
+    headers, a row per parameter, and the start/end markers when an output
+    file is set — and stores it in the table_text attribute as one string.
 
     Raises:
       ADOPipelineDocException: If a parameter is missing 'name' or 'type'.
@@ -202,72 +291,70 @@ class ADOPipelineDoc:
       "default": ":--"
     }
 
-    object_template = {
-      "required": "Yes",
-      "name": '',
-      "type": '',
-      "displayName": '',
-      "values": '',
-      "default": ''
-    }
-
-    use_col = {"displayName": False, "values": False, "default": False}
+    # One list per column instead of a dict per row; the loop appends six
+    # values and never allocates or copies a per-row dict.
+    columns = {key: [] for key in heading_order}
 
-    rows = []
+    # Hoist the loop-invariant lookup out of the per-parameter loop.
+    prettyObject = self.prettyObject
 
     for param in self.parameters:
-      if not param.get('name') or not param.get('type'):
+      # Read each field once; every dict.get is a hash lookup per row.
+      name = param.get('name')
+      param_type = param.get('type')
+      display_name = param.get('displayName', '')
+      values = param.get('values', '')
+      default = param.get('default', '')
+
+      if not name or not param_type:
         raise ADOPipelineDocException(
           f"Parameter missing 'name' or 'type': {param}")
 
-      if param.get('displayName', ''):
-        use_col["displayName"] = True
-
-      if param.get('values', ''):
-        use_col["values"] = True
-
-      row_object = object_template.copy()
-      row_object.update(param)
-
-      if param.get('default', ''):
-        use_col["default"] = True
-        row_object["required"] = ''
-
-      if param.get('type') == 'object' and param.get('default'):
-        row_object['default'] = self.prettyObject(param, key='default')
+      if param_type == 'object' and default:
+        default = prettyObject(param, key='default')
 
-      if param.get('values'):
-        row_object['values'] = self.prettyObject(param, key='values')
-
-      rows.append(row_object)
-
-    for key, value in use_col.items():
-      if not value:
+      if values:
+        # A list of plain scalars renders the same without the yaml.dump
+        # round-trip; nested or quote-needing values still take it.
+        if isinstance(values, list) and all(map(_is_plain_scalar, values)):
+          values = '<br/>'.join(f'- {v}' for v in values)
+        else:
+          values = prettyObject(param, key='values')
+
+      columns['required'].append('' if default else 'Yes')
+      columns['name'].append(name)
+      columns['type'].append(param_type)
+      columns['displayName'].append(display_name)
+      columns['values'].append(values)
+      columns['default'].append(default)
+
+    # An optional column with no truthy entries is unused; dropping the key
+    # from heading_order is enough to hide it from the render below.
+    for key in ('displayName', 'values', 'default'):
+      if not any(columns[key]):
         heading_order.remove(key)
-        for row in rows:
-          row.pop(key, None)
 
-    table_rows = []
-    if self.mdFile is not None: table_rows.append(f"{self.mdStartStr()}")
+    # Format everything into one buffer so writing the table is a single
+    # string instead of a list joined per output.
+    buf = io.StringIO()
+    if self.mdFile is not None: buf.write(self._startMarker + "\n")
 
     # Build the markdown header row
-    header_row = "| " + " | ".join(heading_order) + " |"
-    separator_row = "| " + " | ".join(heading_separator[key]
-                                      for key in heading_order) + " |"
+    buf.write("| " + " | ".join(heading_order) + " |\n")
+    buf.write("| " + " | ".join(heading_separator[key]
+                                for key in heading_order) + " |\n")
 
-    # Add header and separator to table_rows
-    table_rows.append(header_row)
-    table_rows.append(separator_row)
+    # Add parameter rows. The template is specialized once for the surviving
+    # column set, so each row is a single %-format instead of a join.
+    row_fmt = "| " + " | ".join(["%s"] * len(heading_order)) + " |\n"
+    for row in zip(*(columns[key] for key in heading_order)):
+      buf.write(row_fmt % row)
 
-    # Add parameter rows to table_rows
-    for row in rows:
-      row_data = [str(row.get(key, '')) for key in heading_order]
-      row_text = "| " + " | ".join(row_data) + " |"
-      table_rows.append(row_text)
+    # The end marker carries no trailing newline so the text drops into the
+    # existing file exactly where the old marker block ended.
+    if self.mdFile is not None: buf.write(self._endMarker)
 
-    if self.mdFile is not None: table_rows.append(f"{self.mdEndStr()}")
-
-    self.table_rows = table_rows
+    self.table_text = buf.getvalue()
 
   #---------------------------------------------------------------------------
   def writeFile(self):
@@ -286,39 +373,77 @@ class ADOPipelineDoc:
       self.printTable()
       return
 
+    table_bytes = self.table_text.encode()
+
     try:
-      content = self.readFile(self.mdFile)
+      md_file = open(self.mdFile, 'rb')
 
-      start_index = content.find(self.mdStartStr())
-      end_index = content.find(self.mdEndStr())
+    except FileNotFoundError:
+      with open(self.mdFile, 'wb') as file:
+        file.write(table_bytes + b"\n")
+      return
 
-      if start_index == -1 and end_index > -1:
-        raise ADOPipelineDocException(
-          f"No start comment found in {self.mdFile}.")
+    except PermissionError:
+      raise ADOPipelineDocException(
+        f"Permission denied for file {self.mdFile}.")
+
+    with md_file:
+      # Map the file instead of reading it into a Python string; the scan
+      # and slices below work on the mapped pages. mmap rejects empty
+      # files, and an empty target is just an append anyway.
+      if os.fstat(md_file.fileno()).st_size == 0:
+        content = b''
+      else:
+        content = mmap.mmap(md_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+      # One scan locates both markers: the block to replace runs from the
+      # first start marker to the first end marker after it.
+      start_index = -1
+      end_index = -1
+      end_seen = False
+
+      for match in self._markerRE.finditer(content):
+        if match.group(1) is not None:
+          if start_index == -1:
+            start_index = match.start()
+
+        else:
+          end_seen = True
 
+          if start_index > -1:
+            end_index = match.end()
+            break
+
+      # A lone marker means a malformed file.
       if start_index > -1 and end_index == -1:
         raise ADOPipelineDocException(
           f"No end comment found in {self.mdFile}.")
 
-      # Create a temporary file
-      with tempfile.NamedTemporaryFile('w', delete=False) as temp_file:
+      if start_index == -1 and end_seen:
+        raise ADOPipelineDocException(
+          f"No start comment found in {self.mdFile}.")
+
+      # Create the temporary file beside the target so os.replace is an
+      # atomic same-filesystem rename rather than a copy. Writing the
+      # segments separately avoids rebuilding the whole file in memory;
+      # the buffered file object coalesces the writes.
+      temp_dir = os.path.dirname(os.path.abspath(self.mdFile)) or '.'
+      with tempfile.NamedTemporaryFile('wb', delete=False,
+                                       dir=temp_dir) as temp_file:
         temp_file_name = temp_file.name
 
         # No start or end comments, append to end of file
-        if start_index == -1 and end_index == -1:
-          temp_file.write(content + "\n" + "\n".join(self.table_rows))
+        if start_index == -1:
+          temp_file.write(content)
+          temp_file.write(b"\n")
+          temp_file.write(table_bytes)
 
         else:
-          end_index += len(self.mdEndStr())
-          new_content = (content[:start_index] + "\n".join(self.table_rows) +
-                         content[end_index:])
-          temp_file.write(new_content)
+          temp_file.write(content[:start_index])
+          temp_file.write(table_bytes)
+          temp_file.write(content[end_index:])
 
-      os.replace(temp_file_name, self.mdFile)
-
-    except FileNotFoundError:
-      with open(self.mdFile, 'w') as file:
-        file.write("\n".join(self.table_rows) + "\n")
+    os.replace(temp_file_name, self.mdFile)
 
 
 ##############################################################################